@@ -10,6 +10,36 @@ bl_info = {
     'category': 'Cardboard',
 }
 
+class TempImage:
+    def __init__(self, colormap):
+        self.colormap = colormap
+        self.image = None
+
+    def __enter__(self):
+        self.image = self.colormap.generate_image()
+        return self.image
+
+    def __exit__(self, type_, value, tb):
+        image = self.image
+        # only clear users if something picked up the image meanwhile
+        if image.users:
+            image.user_clear()
+        bpy.data.images.remove(image)
+
+temp_image = TempImage
+
+# (blend filepath, default export filepath) of the last invoke
+_default_filepath = (None, None)
+
+def default_filepath():
+    global _default_filepath
+    blend_path, filepath = _default_filepath
+    if blend_path != bpy.data.filepath:
+        blend_path = bpy.data.filepath
+        filepath = bpy.path.ensure_ext(blend_path, ".png")
+        _default_filepath = (blend_path, filepath)
+    return filepath
+
 def export_colormap(obj, filepath, colormap=''):
     if not colormap:
         colormap = cc.colors.Manager(obj).get_export_colormap()
@@ -19,23 +49,21 @@ def export_colormap(obj, filepath, colormap=''):
     colormap = cc.colors.colormap(obj, colormap)
 
     name, ext = os.path.splitext(filepath)
-    filepath = '%s%s%s' % (name, colormap.name, ext)
-
-    image = colormap.generate_image()
-    image.filepath_raw = filepath
-    image.save()
-    image.user_clear()
-    size = image.size[0]
-    bpy.data.images.remove(image)
-
-    with open(filepath, 'a') as fp:
-        fp.write('\x1a')
-        fp.write('COLORMAP\0')
-        fp.write('%i' % size)
-        fp.write('\0')
-        fp.write('%i' % colormap.get_stride())
-        fp.write('\0')
-        fp.write('\0'.join(colormap.get_layers()))
+    filepath = name + colormap.name + ext
+
+    with temp_image(colormap) as image:
+        image.filepath_raw = filepath
+        image.save()
+        size = image.size[0]
+
+    trailer = b'\x1a' + b'\0'.join((
+        b'COLORMAP',
+        str(size).encode('ascii'),
+        str(colormap.get_stride()).encode('ascii'),
+        '\0'.join(colormap.get_layers()).encode('utf-8')))
+
+    with open(filepath, 'ab', buffering=0) as fp:
+        fp.write(trailer)
 
 class ColormapExporter(bpy.types.Operator):
     bl_idname = 'cc.export_colormap'
@@ -65,7 +93,7 @@ class ColormapExporter(bpy.types.Operator):
 
     def invoke(self, context, event):
         if not self.filepath:
-            self.filepath = bpy.path.ensure_ext(bpy.data.filepath, ".png")
+            self.filepath = default_filepath()
         wm = context.window_manager
         wm.fileselect_add(self)
         return {'RUNNING_MODAL'}
@@ -4,10 +4,9 @@ import bpy
 import cc
 
 from cc.export import (
-    Color,
     Vertex,
     Edge,
-    Line,
+    build_lines,
     floats_to_strings,
 )
 
@@ -32,11 +31,6 @@ def export_unity_lines(
         map_size = export_colormap.get_size()
     else:
         map_size = 1
-    bias = 1. / map_size * 0.5
-
-    vertices = []
-    edges = []
-    lines = []
 
     if not color_layer:
         export_layer = cc.colors.Manager(obj).get_export_layer()
@@ -61,107 +55,68 @@ def export_unity_lines(
         if have_aux_colors:
             aux_layer = cc.colors.layer(obj, aux_layer_name)
 
-        (min_x, min_y, min_z) = (max_x, max_y, max_z) = mesh.vertices[0].co
-
-        for i, v in enumerate(mesh.vertices):
-            if v.co.x < min_x:
-                min_x = v.co.x
-            if v.co.x > max_x:
-                max_x = v.co.x
-            if v.co.y < min_y:
-                min_y = v.co.y
-            if v.co.y > max_y:
-                max_y = v.co.y
-            if v.co.z < min_z:
-                min_z = v.co.z
-            if v.co.z > max_z:
-                max_z = v.co.z
-
-            if export_colors:
-                cd = colors.samples[v.index]
-                color = Color(cd.color.r, cd.color.g, cd.color.b, cd.alpha)
-            else:
-                color = Color(1, 1, 1, 1)
-            if have_aux_colors:
-                cd = aux_layer.samples[v.index]
-                aux_color = Color(cd.color.r, cd.color.g, cd.color.b, cd.alpha)
-            else:
-                aux_color = None
-
-            if export_normals:
-                nd = normals.get(v.index)
-                normal = (nd['X'], nd['Y'], nd['Z'])
-            else:
-                normal = (0, 0, 1)
-
-            vertices.append(Vertex(i, v.co, color, normal, aux_color=aux_color))
-
-        for edge in mesh.edges:
-            a = vertices[edge.vertices[0]]
-            b = vertices[edge.vertices[1]]
-            edges.append(Edge(a, b))
-
-        while edges:
-            line = Line(edges.pop(0))
-            edges = line.consume(edges)
-            lines.append(line)
-
-        with open(filepath, 'w') as fp:
-            class_name = os.path.basename(filepath)[:-3]
-
-            for i, vertex in enumerate(vertices):
-                x, y, z = floats_to_strings((-vertex.co.x, vertex.co.y, vertex.co.z), precision)
-                fp.write('%s %s %s' % (x, y, z))
-                if i < len(vertices) - 1:
-                    fp.write(' ')
-            fp.write('\n')
-
-            for i, vertex in enumerate(vertices):
-                r, g, b, a = floats_to_strings((vertex.color.r, vertex.color.g, vertex.color.b, vertex.color.a), precision)
-                fp.write('%s %s %s %s' % (r, g, b, a))
-                if i < len(vertices) - 1:
-                    fp.write(' ')
-            fp.write('\n')
-
-            if export_colormap:
-                for i, vertex in enumerate(vertices):
-                    u = int(vertex.index % map_size) / map_size + bias
-                    v = int(vertex.index / map_size) / map_size + bias
-                    u, v = floats_to_strings((u, v), precision)
-                    fp.write('%s %s' % (u, v))
-                    if i < len(vertices) - 1:
-                        fp.write(' ')
-            elif aux_layer:
-                for i, vertex in enumerate(vertices):
-                    rgba = vertex.aux_color.r, vertex.aux_color.g, vertex.aux_color.b, vertex.aux_color.a
-                    u, v = cc.colors.rgba_to_uv(rgba)
-                    fp.write('%s %s' % (u, v))
-                    if i < len(vertices) - 1:
-                        fp.write(' ')
-            else:
-                fp.write(' '.join(['0'] * (len(vertices) * 2)))
-            fp.write('\n')
-
-            indices = []
-            for line in lines:
-                for i in range(len(line.vertices) - 1):
-                    indices.extend([line.vertices[i].index, line.vertices[i + 1].index])
-            fp.write(' '.join(map(str, indices)))
-            fp.write('\n')
-
-            for i, vertex in enumerate(vertices):
-                x, y, z = floats_to_strings((-vertex.normal[0], vertex.normal[1], vertex.normal[2]), precision)
-                fp.write('%s %s %s' % (x, y, z))
-                if i < len(vertices) - 1:
-                    fp.write(' ')
-
-            if aux_layer:
-                fp.write('\n')
-                for i, vertex in enumerate(vertices):
-                    r, g, b, a = floats_to_strings((vertex.aux_color.r, vertex.aux_color.g, vertex.aux_color.b, vertex.aux_color.a), precision)
-                    fp.write('%s %s %s %s' % (r, g, b, a))
-                    if i < len(vertices) - 1:
-                        fp.write(' ')
+        count = len(mesh.vertices)
+        vertices = [Vertex(i) for i in range(count)]
+
+        co = [0.] * (count * 3)
+        mesh.vertices.foreach_get('co', co)
+        co[0::3] = [-x for x in co[0::3]]
+
+        if export_colors:
+            rgba = []
+            for s in colors.samples:
+                rgba.extend((s.color.r, s.color.g, s.color.b, s.alpha))
+        else:
+            rgba = [1] * (count * 4)
+
+        if have_aux_colors:
+            aux_rgba = []
+            for s in aux_layer.samples:
+                aux_rgba.extend((s.color.r, s.color.g, s.color.b, s.alpha))
+
+        if export_normals:
+            nor = []
+            for i in range(count):
+                nd = normals.get(i)
+                nor.extend((-nd['X'], nd['Y'], nd['Z']))
+        else:
+            nor = [0, 0, 1] * count
+
+        edge_vertices = [0] * (len(mesh.edges) * 2)
+        mesh.edges.foreach_get('vertices', edge_vertices)
+        edges = [Edge(vertices[a], vertices[b]) for a, b in
+                 zip(edge_vertices[0::2], edge_vertices[1::2])]
+
+        lines = build_lines(edges)
+
+        rows = []
+        rows.append(' '.join(floats_to_strings(co, precision)))
+        rows.append(' '.join(floats_to_strings(rgba, precision)))
+
+        if export_colormap:
+            uv = cc.colors.colormap_uvs(count, map_size)
+            rows.append(' '.join(floats_to_strings(uv, precision)))
+        elif aux_layer:
+            uv = []
+            for i in range(0, len(aux_rgba), 4):
+                uv.extend(cc.colors.rgba_to_uv(aux_rgba[i:i + 4]))
+            rows.append(' '.join(map(str, uv)))
+        else:
+            rows.append(' '.join(['0'] * (count * 2)))
+
+        indices = []
+        for line in lines:
+            for i in range(len(line.vertices) - 1):
+                indices.extend([line.vertices[i].index, line.vertices[i + 1].index])
+        rows.append(' '.join(map(str, indices)))
+
+        rows.append(' '.join(floats_to_strings(nor, precision)))
+
+        if aux_layer:
+            rows.append(' '.join(floats_to_strings(aux_rgba, precision)))
+
+        with open(filepath, 'wb') as fp:
+            fp.write('\n'.join(rows).encode('ascii'))
 
 class UnityLineExporter(bpy.types.Operator):
     bl_idname = 'cc.export_unity_lines'
@@ -6,7 +6,7 @@ from cc.export import (
     Color,
     Vertex,
     Edge,
-    Line,
+    build_lines,
     floats_to_strings,
 )
 
@@ -36,7 +36,6 @@ def export_unity_lines_cs(
 
     vertices = []
     edges = []
-    lines = []
 
     if not color_layer:
         export_layer = cc.colors.Manager(obj).get_export_layer()
@@ -49,22 +48,13 @@ def export_unity_lines_cs(
         if export_colors:
             colors = cc.colors.layer(obj, color_layer)
 
-        (min_x, min_y, min_z) = (max_x, max_y, max_z) = mesh.vertices[0].co
+        co = [0.] * (len(mesh.vertices) * 3)
+        mesh.vertices.foreach_get('co', co)
+        min_x, max_x = min(co[0::3]), max(co[0::3])
+        min_y, max_y = min(co[1::3]), max(co[1::3])
+        min_z, max_z = min(co[2::3]), max(co[2::3])
 
         for i, v in enumerate(mesh.vertices):
-            if v.co.x < min_x:
-                min_x = v.co.x
-            if v.co.x > max_x:
-                max_x = v.co.x
-            if v.co.y < min_y:
-                min_y = v.co.y
-            if v.co.y > max_y:
-                max_y = v.co.y
-            if v.co.z < min_z:
-                min_z = v.co.z
-            if v.co.z > max_z:
-                max_z = v.co.z
-
             if export_colors:
                 cd = colors.samples[v.index]
                 color = Color(cd.color.r, cd.color.g, cd.color.b, cd.alpha)
@@ -78,10 +68,7 @@ def export_unity_lines_cs(
             b = vertices[edge.vertices[1]]
             edges.append(Edge(a, b))
 
-        while edges:
-            line = Line(edges.pop(0))
-            edges = line.consume(edges)
-            lines.append(line)
+        lines = build_lines(edges)
 
         with open(filepath, 'w') as fp:
             class_name = os.path.basename(filepath)[:-3]
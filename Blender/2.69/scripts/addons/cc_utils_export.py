@@ -17,6 +17,9 @@ EXPORT_SCENE_NAMES = (
     '__Export__', '__export__',
 )
 
+NONE = '__NONE__'
+ENUM_NONE = (NONE, '', '')
+
 def update_autoexport_prop(self, context):
     if self.autoexport and export not in bpy.app.handlers.save_pre:
         bpy.app.handlers.save_pre.append(export)
@@ -98,35 +101,45 @@ class ExportData(bpy.types.Operator):
             self.report({'INFO'}, "Exported %i lines, %i colormaps" % (len(lines), len(colormaps)))
         return {'FINISHED'}
 
-@cc.ops.editmode
 def set_export(objects, layer, aux, colormap):
+    # bail before the editmode toggle when there is nothing to set
+    if objects and (layer or aux or colormap):
+        apply_export(objects, layer, aux, colormap)
+
+@cc.ops.editmode
+def apply_export(objects, layer, aux, colormap):
+    set_aux = bool(aux)
+    if aux == NONE:
+        aux = None
+    set_colormap = bool(colormap)
+    if colormap == NONE:
+        colormap = None
+
     for obj in objects:
-        if obj.type == 'MESH':
-            m = cc.colors.Manager(obj)
-            if layer:
-                m.set_export_layer(layer)
-            if aux:
-                if aux == '__NONE__':
-                    aux = None
-                m.set_aux_layer(aux)
-            if colormap:
-                if colormap == '__NONE__':
-                    colormap = None
-                m.set_export_colormap(colormap)
+        m = cc.colors.Manager(obj)
+        if layer:
+            m.set_export_layer(layer)
+        if set_aux:
+            m.set_aux_layer(aux)
+        if set_colormap:
+            m.set_export_colormap(colormap)
+
+# blender doesn't own dynamic enum strings, so keep the last items alive
+_layer_items = []
+_colormap_items = []
+
+def enum_items(names):
+    return [ENUM_NONE] + [(name, name, name) for name in names]
 
 def shared_colormap_items(scene, context):
     colormaps = cc.colors.find_shared_colormaps(context.selected_objects)
-    enum = [('__NONE__', '', '')]
-    for name in colormaps:
-        enum.append((name, name, name))
-    return enum
+    _colormap_items[:] = enum_items(colormaps)
+    return _colormap_items
 
 def shared_layer_items(scene, context):
     layers = cc.colors.find_shared_layers(context.selected_objects)
-    enum = [('__NONE__', '', '')]
-    for name in layers:
-        enum.append((name, name, name))
-    return enum
+    _layer_items[:] = enum_items(layers)
+    return _layer_items
 
 class SetExport(bpy.types.Operator):
     bl_idname = 'cc.set_export'
@@ -148,17 +161,16 @@ class SetExport(bpy.types.Operator):
         return (obj and obj.type == 'MESH')
 
     def invoke(self, context, event):
-        shared_layers = cc.colors.find_shared_layers(
-            context.selected_objects)
+        selected = context.selected_objects
+        shared_layers = cc.colors.find_shared_layers(selected)
+        shared_colormaps = cc.colors.find_shared_colormaps(selected)
         default_layer = cc.colors.find_default_layer(
-            context.selected_objects, for_export=True)
+            selected, for_export=True)
         default_aux = cc.colors.find_default_layer(
-            context.selected_objects, for_aux=True)
+            selected, for_aux=True)
 
-        shared_colormaps = cc.colors.find_shared_colormaps(
-            context.selected_objects)
         default_colormap = cc.colors.find_default_colormap(
-            context.selected_objects, for_export=True)
+            selected, for_export=True)
 
         if default_layer and default_layer in shared_layers:
             self.layer = default_layer
@@ -171,7 +183,8 @@ class SetExport(bpy.types.Operator):
         return wm.invoke_props_dialog(self)
 
     def execute(self, context):
-        set_export(context.selected_objects, self.layer, self.aux, self.colormap)
+        meshes = [o for o in context.selected_objects if o.type == 'MESH']
+        set_export(meshes, self.layer, self.aux, self.colormap)
         return {'FINISHED'}
 
 class ExportMenu(bpy.types.Menu):
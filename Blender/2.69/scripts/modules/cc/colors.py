@@ -1,8 +1,8 @@
 import bpy
 import cc
 import math
+import string
 import bmesh
-import struct
 import mathutils
 
 class ColorError(Exception): pass
@@ -10,6 +10,9 @@ class ColorError(Exception): pass
 BASENAME = 'Col'
 METADATA_PROP = 'ColorMeta'
 COLORMAP_MINSIZE = 16
+LINE_CHANNELS = ('R', 'G', 'B', 'A')
+LINE_SUFFIXES = frozenset('.%s' % c for c in LINE_CHANNELS)
+INV_255 = 1 / 255.0
 
 def colormeta(obj):
     data = obj.data
@@ -40,7 +43,8 @@ def colormap(obj, name=None, base=None, **kw):
         return Manager(obj, base=base).get_or_add_colormap(name, **kw)
 
 def color_to_hex(rgb):
-    return '%02x%02x%02x' % (rgb[0] * 255, rgb[1] * 255, rgb[2] * 255)
+    return '{:02x}{:02x}{:02x}'.format(
+        int(rgb[0] * 255), int(rgb[1] * 255), int(rgb[2] * 255))
 
 def hex_to_color(val):
     try:
@@ -51,14 +55,16 @@ def hex_to_color(val):
     if val == '0':
         val = '000000'
     if len(val) == 3:
-        val = val[2] + val[2] + val[1] + val[1] + val[0] + val[0]
+        val = val[0] + val[0] + val[1] + val[1] + val[2] + val[2]
 
-    try:
-        t = struct.unpack('BBB', bytes.fromhex(val))
-    except ValueError:
+    if len(val) != 6 or not all(c in string.hexdigits for c in val):
         return mathutils.Color((1, 0, 1))
-    else:
-        return mathutils.Color((t[0] / 255.0, t[1] / 255.0, t[2] / 255.0))
+
+    n = int(val, 16)
+    return mathutils.Color((
+        (n >> 16) * INV_255,
+        ((n >> 8) & 0xff) * INV_255,
+        (n & 0xff) * INV_255))
 
 def rgba_to_uv(rgba, precision=4096):
     p = precision - 1
@@ -174,6 +180,30 @@ def find_shared_colormaps(objects):
 
     return layers
 
+# texel-centered uvs filling a size x size colormap row by row
+def colormap_uvs(count, size):
+    bias = 1. / size * 0.5
+    rows = int(math.ceil(count / size))
+    uv = [0.] * (count * 2)
+    uv[0::2] = ([x / size + bias for x in range(size)] * rows)[:count]
+    uv[1::2] = [
+        y / size + bias for y in range(rows) for x in range(size)][:count]
+    return uv
+
+# bulk mesh topology that several poly color layers can share
+def poly_topology(data):
+    loop_vertices = [0] * len(data.loops)
+    data.loops.foreach_get('vertex_index', loop_vertices)
+    count = len(data.polygons)
+    loop_start = [0] * count
+    data.polygons.foreach_get('loop_start', loop_start)
+    loop_total = [0] * count
+    data.polygons.foreach_get('loop_total', loop_total)
+    polygons = [
+        (poly, range(start, start + total))
+        for poly, start, total in zip(data.polygons, loop_start, loop_total)]
+    return loop_vertices, data.vertices[:], polygons
+
 class Color(mathutils.Color):
     def __mul__(self, o):
         if hasattr(o, '__len__'):
@@ -216,6 +246,8 @@ class Manager:
             base = BASENAME
         self.base = base
         self._meta = None
+        self._is_line = None
+        self._topology = None
 
     @property
     def meta(self):
@@ -223,10 +255,17 @@ class Manager:
             self._meta = colormeta(self.obj)
         return self._meta
 
+    def get_topology(self):
+        if self._topology is None:
+            self._topology = poly_topology(self.obj.data)
+        return self._topology
+
     def is_line(self):
-        return (
-            len(self.obj.data.polygons) == 0 and
-            len(self.obj.data.edges) > 0)
+        if self._is_line is None:
+            self._is_line = (
+                len(self.obj.data.polygons) == 0 and
+                len(self.obj.data.edges) > 0)
+        return self._is_line
 
     def get_unique_name(self, base=None, lookup=None):
         if lookup is None:
@@ -248,12 +287,16 @@ class Manager:
         if self.is_line():
             layers = []
             keys = self.obj.vertex_groups.keys()
+            channels = {}
+            for key in keys:
+                base, dot, suffix = key.rpartition('.')
+                if dot:
+                    channels.setdefault(base, set()).add(suffix)
+            # walk the keys again to keep vertex group order
             for key in keys:
                 if key.endswith('.R'):
                     name = key[:-2]
-                    if ('%s.G' % name in keys and
-                        '%s.B' % name in keys and
-                        '%s.A' % name in keys):
+                    if channels[name].issuperset(LINE_CHANNELS):
                         layers.append(name)
                         layers.append('%s.Alpha' % name)
             return layers
@@ -328,11 +371,9 @@ class Manager:
 
         if v.active:
             n = v.active.name
-            if (n.endswith('.R') or
-                n.endswith('.G') or
-                n.endswith('.B') or
-                n.endswith('.A')):
-                if n.endswith('.A'):
+            suffix = n[-2:]
+            if suffix in LINE_SUFFIXES:
+                if suffix == '.A':
                     name = '%slpha' % n
                 else:
                     name = n[:-2]
@@ -341,12 +382,13 @@ class Manager:
                     meta['active_line_color'] = name
                 else:
                     layer = None
-            elif 'active_line_color' in meta:
-                n = name = meta['active_line_color']
-                if n.endswith('.Alpha'):
-                    n = n[:-6]
-                if '%s.R' % n in v:
-                    layer = LineColorLayer(self.obj, name)
+            else:
+                n = name = meta.get('active_line_color')
+                if n is not None:
+                    if n.endswith('.Alpha'):
+                        n = n[:-6]
+                    if '%s.R' % n in v:
+                        layer = LineColorLayer(self.obj, name)
 
         if layer is None:
             layers = self.list_layers()
@@ -364,8 +406,9 @@ class Manager:
     def get_export_layer(self):
         if self.is_line():
             meta = self.meta
-            if 'export_line_color' in meta:
-                layer = LineColorLayer(self.obj, meta['export_line_color'])
+            name = meta.get('export_line_color')
+            if name is not None:
+                layer = LineColorLayer(self.obj, name)
                 if layer.exists():
                     return layer
             layers = self.list_layers()
@@ -390,13 +433,15 @@ class Manager:
     def get_aux_layer(self):
         meta = self.meta
         if self.is_line():
-            if 'aux_line_color' in meta:
-                layer = LineColorLayer(self.obj, meta['aux_line_color'])
+            name = meta.get('aux_line_color')
+            if name is not None:
+                layer = LineColorLayer(self.obj, name)
                 if layer.exists():
                     return layer
         else:
-            if 'aux_poly_color' in meta:
-                layer = PolyColorLayer(self.obj, meta['aux_poly_color'])
+            name = meta.get('aux_poly_color')
+            if name is not None:
+                layer = PolyColorLayer(self.obj, name)
                 if layer.exists():
                     return layer
 
@@ -493,19 +538,33 @@ class Manager:
     def foreach(self, *names):
         if not names:
             return
+        layers = []
         generators = []
         for n in names:
             layer = self.get_layer(n)
             if not layer:
                 raise ColorError('%s layer does not exist' % layer)
-            generators.append(layer._generate_samples())
-        while True:
-            try:
-                samples = [next(g) for g in generators]
-            except StopIteration:
-                break
-            yield samples
-            [s.save() for s in samples]
+            layers.append(layer)
+            if self.is_line():
+                generators.append(layer._generate_samples())
+            else:
+                generators.append(layer._generate_samples(self.get_topology()))
+        batches = [[] for layer in layers]
+        try:
+            while True:
+                try:
+                    samples = [next(g) for g in generators]
+                except StopIteration:
+                    break
+                yield samples
+                for batch, sample in zip(batches, samples):
+                    batch.append(sample)
+        finally:
+            # write each layer back in one batch instead of per sample
+            for layer, batch in zip(layers, batches):
+                if batch:
+                    layer._samples = batch
+                    layer._save_samples()
 
     def exec_color_ops(self, ops):
         layers = self.list_layers()
@@ -521,14 +580,13 @@ class LineColorLayer:
 
         self.obj = obj
         self._name = name
+        self._channels = tuple('%s.%s' % (name, c) for c in LINE_CHANNELS)
         self.data = obj.data
         self._samples = []
 
         if self.exists():
-            self.r = obj.vertex_groups['%s.R' % name]
-            self.g = obj.vertex_groups['%s.G' % name]
-            self.b = obj.vertex_groups['%s.B' % name]
-            self.a = obj.vertex_groups['%s.A' % name]
+            v = obj.vertex_groups
+            self.r, self.g, self.b, self.a = (v[c] for c in self._channels)
 
     @property
     def name(self):
@@ -537,25 +595,35 @@ class LineColorLayer:
         else:
             return self._name
 
+    # one weight column per group, None where a vertex isn't assigned
+    def _read_weights(self, *groups):
+        vertices = self.data.vertices
+        columns = [[None] * len(vertices) for g in groups]
+        lookup = dict(zip((g.index for g in groups), columns))
+        for vert in vertices:
+            for g in vert.groups:
+                column = lookup.get(g.group)
+                if column is not None:
+                    column[vert.index] = g.weight
+        return columns
+
     def _generate_samples(self):
         obj = self.obj
+        vertices = self.data.vertices
         if not self.alpha:
-            for vert in self.data.vertices:
-                try:
-                    color = Color((
-                       self.r.weight(vert.index),
-                       self.g.weight(vert.index),
-                       self.b.weight(vert.index)))
-                    alpha = self.a.weight(vert.index)
-                except RuntimeError:
+            r, g, b, a = self._read_weights(self.r, self.g, self.b, self.a)
+            for vert, rgba in zip(vertices, zip(r, g, b, a)):
+                if None in rgba:
                     color = Color((1, 1, 1))
                     alpha = 1
+                else:
+                    color = Color(rgba[:3])
+                    alpha = rgba[3]
                 yield ColorLayerSample(obj, self, None, 0, vert, color, alpha)
         else:
-            for vert in self.data.vertices:
-                try:
-                    alpha = self.a.weight(vert.index)
-                except RuntimeError:
+            a, = self._read_weights(self.a)
+            for vert, alpha in zip(vertices, a):
+                if alpha is None:
                     alpha = 1
                 color = Color((alpha, alpha, alpha))
                 yield ColorLayerSample(obj, self, None, 0, vert, color, 1)
@@ -564,43 +632,54 @@ class LineColorLayer:
         self._samples = list(self._generate_samples())
 
     def _save_samples(self):
+        # vertex groups take one weight per add() call, so bucket the
+        # vertex indices by weight and add each bucket at once
         kw = {'type': 'REPLACE'}
         if not self.alpha:
+            r, g, b, a = {}, {}, {}, {}
             for sample in self._samples:
                 i = sample.vertex.index
-                self.r.add([i], sample.color.r, **kw)
-                self.g.add([i], sample.color.g, **kw)
-                self.b.add([i], sample.color.b, **kw)
-                self.a.add([i], sample.alpha, **kw)
+                color = sample.color
+                r.setdefault(color.r, []).append(i)
+                g.setdefault(color.g, []).append(i)
+                b.setdefault(color.b, []).append(i)
+                a.setdefault(sample.alpha, []).append(i)
+            buckets = ((self.r, r), (self.g, g), (self.b, b), (self.a, a))
         else:
+            a = {}
             for sample in self._samples:
-                i = sample.vertex.index
-                self.a.add([i], sample.color.v, **kw)
+                a.setdefault(sample.color.v, []).append(sample.vertex.index)
+            buckets = ((self.a, a),)
+        for group, weights in buckets:
+            for weight, indices in weights.items():
+                group.add(indices, weight, **kw)
+        cc.ui.flag(self.data)
+
+    def _save_sample(self, sample):
+        kw = {'type': 'REPLACE'}
+        i = sample.vertex.index
+        if not self.alpha:
+            self.r.add([i], sample.color.r, **kw)
+            self.g.add([i], sample.color.g, **kw)
+            self.b.add([i], sample.color.b, **kw)
+            self.a.add([i], sample.alpha, **kw)
+        else:
+            self.a.add([i], sample.color.v, **kw)
         cc.ui.flag(self.data)
 
     def exists(self):
-        n = self._name
         v = self.obj.vertex_groups
-
-        return (
-            ('%s.R' % n) in v and
-            ('%s.G' % n) in v and
-            ('%s.B' % n) in v and
-            ('%s.A' % n) in v)
+        return all(c in v for c in self._channels)
 
     def create(self, **kw):
         if self.exists():
             return
 
-        n = self._name
         v = self.obj.vertex_groups
 
         active = v.active_index
 
-        r_name = '%s.R' % n
-        g_name = '%s.G' % n
-        b_name = '%s.B' % n
-        a_name = '%s.A' % n
+        r_name, g_name, b_name, a_name = self._channels
 
         if r_name in v:
             v.remove(v[r_name])
@@ -629,14 +708,11 @@ class LineColorLayer:
         v.active_index = active
 
     def destroy(self):
-        n = self._name
         v = self.obj.vertex_groups
 
         if self.exists():
-            v.remove(v[('%s.R' % n)])
-            v.remove(v[('%s.G' % n)])
-            v.remove(v[('%s.B' % n)])
-            v.remove(v[('%s.A' % n)])
+            for c in self._channels:
+                v.remove(v[c])
             self._samples = []
             self.r = self.g = self.b = self.a = None
 
@@ -676,7 +752,7 @@ class PolyColorLayer:
             alpha = '%s.Alpha' % name
             self.alpha = obj.data.vertex_colors.get(alpha)
 
-    def _generate_samples(self):
+    def _generate_samples(self, topology=None):
         obj = self.obj
         data = self.data
         colors = self.colors.data
@@ -685,19 +761,31 @@ class PolyColorLayer:
         else:
             alpha = None
 
-        if not len(colors):
+        count = len(colors)
+        if not count:
             return
 
-        for poly in data.polygons:
-            for idx, ptr in enumerate(poly.loop_indices):
-                vert = data.vertices[poly.vertices[idx]]
-                color = Color(colors[ptr].color)
+        rgb = [0.] * (count * 3)
+        colors.foreach_get('color', rgb)
+        if alpha:
+            a = [0.] * (count * 3)
+            alpha.foreach_get('color', a)
+
+        if topology is None:
+            topology = poly_topology(data)
+        loop_vertices, vertices, polygons = topology
+
+        for poly, loops in polygons:
+            for ptr in loops:
+                vert = vertices[loop_vertices[ptr]]
+                p = ptr * 3
+                color = Color(rgb[p:p + 3])
                 if alpha:
-                    alpha_ = alpha[ptr].color.v
+                    alpha_ = max(a[p:p + 3])
                 else:
                     alpha_ = 1
                 yield ColorLayerSample(
-                    obj, self, poly, ptr, vert, color.copy(), alpha_)
+                    obj, self, poly, ptr, vert, color, alpha_)
 
     def _get_samples(self):
         self._samples = list(self._generate_samples())
@@ -709,11 +797,28 @@ class PolyColorLayer:
         else:
             alpha = None
 
+        count = len(colors)
+        rgb = [0.] * (count * 3)
+        colors.foreach_get('color', rgb)
+        if alpha:
+            a = [0.] * (count * 3)
+            alpha.foreach_get('color', a)
+
         for sample in self._samples:
-            colors[sample.poly_index].color = mathutils.Color(sample.color)
+            p = sample.poly_index * 3
+            rgb[p:p + 3] = sample.color
             if alpha:
-                a = sample.alpha
-                alpha[sample.poly_index].color = mathutils.Color((a, a, a))
+                a[p] = a[p + 1] = a[p + 2] = sample.alpha
+
+        colors.foreach_set('color', rgb)
+        if alpha:
+            alpha.foreach_set('color', a)
+
+    def _save_sample(self, sample):
+        self.colors.data[sample.poly_index].color = sample.color
+        if self.alpha:
+            a = sample.alpha
+            self.alpha.data[sample.poly_index].color = (a, a, a)
 
     def exists(self):
         return self.name in self.data.vertex_colors
@@ -789,30 +894,7 @@ class ColorLayerSample:
             return self.vertex.select
 
     def save(self):
-        if isinstance(self.layer, LineColorLayer):
-            self._save_line()
-        else:
-            self._save_poly()
-
-    def _save_line(self):
-        layer = self.layer
-        kw = {'type': 'REPLACE'}
-        i = self.vertex.index
-        if not layer.alpha:
-            layer.r.add([i], self.color.r, **kw)
-            layer.g.add([i], self.color.g, **kw)
-            layer.b.add([i], self.color.b, **kw)
-            layer.a.add([i], self.alpha, **kw)
-        else:
-            layer.a.add([i], self.color.v, **kw)
-        cc.ui.flag(self.obj.data)
-
-    def _save_poly(self):
-        colors = self.layer.colors.data
-        colors[self.poly_index].color = mathutils.Color(self.color)
-        if self.layer.alpha:
-            a = self.alpha
-            self.layer.alpha.data[self.poly_index].color = mathutils.Color((a, a, a))
+        self.layer._save_sample(self)
 
 class ColorOp:
     def rgb(*args):
@@ -849,21 +931,33 @@ class ColorOp:
         'hsv': hsv,
     }
 
+    # (source, layers, active layer) -> (code, params, needed)
+    compiled = {}
+    compiled_max = 64
+
     def __init__(self, obj, source, layers):
         self.obj = obj
         self.source = source
         self.layers = layers
 
-    def execute(self):
+    def prepare(self):
         obj = self.obj
         layers = self.layers
         source = self.source
 
+        active = None
+        if '__active__' in source:
+            active = layer(obj).name
+
+        cache_key = (source, tuple(layers), active)
+        cached = ColorOp.compiled.get(cache_key)
+        if cached is not None:
+            return cached
+
         needed = []
         params = []
 
-        if '__active__' in source:
-            active = layer(obj).name
+        if active is not None:
             source = source.replace('__active__', '[%s]' % active)
 
         for i, key in enumerate(layers):
@@ -876,6 +970,14 @@ class ColorOp:
 
         op = compile(source, '<string>', 'exec')
 
+        if len(ColorOp.compiled) >= ColorOp.compiled_max:
+            ColorOp.compiled.clear()
+        cached = ColorOp.compiled[cache_key] = (op, params, needed)
+        return cached
+
+    def execute(self):
+        op, params, needed = self.prepare()
+
         for symbols in foreach(self.obj, *needed):
             env = dict(zip(params, symbols))
             exec(op, self.env, env)
@@ -896,25 +998,38 @@ class Colormap:
         data = self.data
         meta = colormeta(self.obj)
 
-        if 'colormaps' not in meta:
+        colormap_data = meta.get('colormaps')
+        if colormap_data is None:
             meta['colormaps'] = {}
-        self.colormap_data = meta['colormaps']
+            colormap_data = meta['colormaps']
+        self.colormap_data = colormap_data
+
+        uv_indices = dict(
+            (name, index)
+            for index, name in enumerate(data.uv_layers.keys()))
+        stale = []
+        renamed = []
 
         for tex in self.colormap_data.keys():
-            if tex not in data.uv_layers:
+            if tex not in uv_indices:
                 # removed from ui list
-                del self.colormap_data[tex]
+                stale.append(tex)
             elif tex not in data.uv_textures:
                 # renamed in ui list
-                index = data.uv_layers.keys().index(tex)
-                name = data.uv_textures[index].name
-                data.uv_layers[tex].name = name
-                self.colormap_data[name] = self.colormap_data[tex]
-                del self.colormap_data[tex]
+                name = data.uv_textures[uv_indices[tex]].name
+                renamed.append((tex, name))
             else:
                 # not a colormap
                 pass
 
+        for tex in stale:
+            del self.colormap_data[tex]
+
+        for tex, name in renamed:
+            data.uv_layers[tex].name = name
+            self.colormap_data[name] = self.colormap_data[tex]
+            del self.colormap_data[tex]
+
     def exists(self):
         return (
             self.name in self.data.uv_textures and
@@ -1006,14 +1121,9 @@ class Colormap:
 
 class PolyColormap(Colormap):
     def update_uv_coords(self):
-        size = self.get_size()
-        bias = 1. / size * 0.5
         uv_layer = self.data.uv_layers[self.name]
-        for i, uv in enumerate(uv_layer.data):
-            x = int(i % size) / size
-            y = int(i / size) / size
-            uv.uv.x = x + bias
-            uv.uv.y = y + bias
+        uv_layer.data.foreach_set('uv', colormap_uvs(
+            len(uv_layer.data), self.get_size()))
 
     def create(self):
         super(PolyColormap, self).create()
@@ -1046,7 +1156,10 @@ class PolyColormap(Colormap):
         vcolors = self.data.vertex_colors
         size = self.get_size()
         layers = self.get_layers()
-        pixels = image.pixels
+        if not any(layer in vcolors for layer in layers):
+            return image
+
+        pixels = list(image.pixels[:])
         stride = int(image.depth / 8)
 
         for index, layer in enumerate(layers):
@@ -1059,18 +1172,24 @@ class PolyColormap(Colormap):
             else:
                 alpha = None
 
+            count = len(colors)
             offset = int(math.ceil(
-                len(colors) / size) * size * stride * index)
+                count / size) * size * stride * index)
+            end = offset + count * stride
+
+            rgb = [0.] * (count * 3)
+            colors.foreach_get('color', rgb)
+            pixels[offset + 0:end:stride] = rgb[0::3]
+            pixels[offset + 1:end:stride] = rgb[1::3]
+            pixels[offset + 2:end:stride] = rgb[2::3]
+            if alpha:
+                alpha.foreach_get('color', rgb)
+                pixels[offset + 3:end:stride] = list(map(
+                    max, rgb[0::3], rgb[1::3], rgb[2::3]))
+            else:
+                pixels[offset + 3:end:stride] = [1.] * count
 
-            for i, c in enumerate(colors):
-                p = offset + i * stride
-                image.pixels[p + 0] = c.color.r
-                image.pixels[p + 1] = c.color.g
-                image.pixels[p + 2] = c.color.b
-                if alpha:
-                    image.pixels[p + 3] = alpha[i].color.v
-                else:
-                    image.pixels[p + 3] = 1
+        image.pixels[:] = pixels
 
         return image
 
@@ -1096,24 +1215,30 @@ class LineColormap(Colormap):
 
         with cc.utils.modified_mesh(self.obj) as mesh:
             size = self.get_size()
-            layers = self.get_layers()
-            pixels = image.pixels
+            manager = Manager(self.obj)
+            layers = [
+                (index, manager.get_layer(layer))
+                for index, layer in enumerate(self.get_layers())]
+            layers = [(index, colors) for index, colors in layers if colors]
+            if not layers:
+                return image
+
+            pixels = list(image.pixels[:])
             stride = int(image.depth / 8)
 
-            for index, layer in enumerate(layers):
-                colors = Manager(self.obj).get_layer(layer)
-                if not colors:
-                    continue
-
+            for index, colors in layers:
+                samples = colors.samples
+                count = len(samples)
                 offset = int(math.ceil(
-                    len(colors.samples) / size) * size * stride * index)
+                    count / size) * size * stride * index)
+                end = offset + count * stride
+
+                pixels[offset + 0:end:stride] = [s.color.r for s in samples]
+                pixels[offset + 1:end:stride] = [s.color.g for s in samples]
+                pixels[offset + 2:end:stride] = [s.color.b for s in samples]
+                pixels[offset + 3:end:stride] = [s.alpha for s in samples]
 
-                for i, s in enumerate(colors.samples):
-                    p = offset + i * stride
-                    image.pixels[p + 0] = s.color.r
-                    image.pixels[p + 1] = s.color.g
-                    image.pixels[p + 2] = s.color.b
-                    image.pixels[p + 3] = s.alpha
+            image.pixels[:] = pixels
 
         return image
 
@@ -1131,6 +1256,8 @@ class Sampler:
             raise ColorError('invalid color layer')
         self.layer = layer
         self.modifier_settings = []
+        self.triangles = None
+        self.loop_colors = {}
 
     def __enter__(self):
         self.install_triangulated()
@@ -1179,30 +1306,56 @@ class Sampler:
     def raycast(self, start, end, layer=None):
         return self.sample(layer=layer, *self.obj.ray_cast(start, end))
 
+    # vertex positions, triangle loops and areas, fetched once per sampler
+    def get_triangles(self):
+        if self.triangles is None:
+            mesh = self.mesh
+            polygons = mesh.polygons
+
+            co = [0.] * (len(mesh.vertices) * 3)
+            mesh.vertices.foreach_get('co', co)
+
+            loop_vertices = [0] * len(mesh.loops)
+            mesh.loops.foreach_get('vertex_index', loop_vertices)
+            loop_start = [0] * len(polygons)
+            polygons.foreach_get('loop_start', loop_start)
+            area = [0.] * len(polygons)
+            polygons.foreach_get('area', area)
+
+            self.triangles = co, loop_vertices, loop_start, area
+        return self.triangles
+
+    def get_loop_colors(self, layer):
+        colors = self.loop_colors.get(layer)
+        if colors is None:
+            data = self.mesh.vertex_colors[layer].data
+            colors = [0.] * (len(data) * 3)
+            data.foreach_get('color', colors)
+            self.loop_colors[layer] = colors
+        return colors
+
     def sample(self, point, normal, face, layer=None):
         if face == -1:
             return mathutils.Color((0, 0, 0))
 
-        obj = self.obj
-        mesh = self.mesh
-        colors = self.layer.data
-
-        if layer is not None:
-            colors = mesh.vertex_colors[layer].data
-
-        poly = mesh.polygons[face]
-        vert_a = mesh.vertices[poly.vertices[0]].co
-        vert_b = mesh.vertices[poly.vertices[1]].co
-        vert_c = mesh.vertices[poly.vertices[2]].co
-        color_a = colors[poly.loop_indices[0]].color
-        color_b = colors[poly.loop_indices[1]].color
-        color_c = colors[poly.loop_indices[2]].color
-        total_area = poly.area
-        area_a = mathutils.geometry.area_tri(point, vert_b, vert_c)
-        area_b = mathutils.geometry.area_tri(point, vert_a, vert_c)
-        area_c = mathutils.geometry.area_tri(point, vert_a, vert_b)
-        r = (color_a.r * area_a + color_b.r * area_b + color_c.r * area_c) / total_area
-        g = (color_a.g * area_a + color_b.g * area_b + color_c.g * area_c) / total_area
-        b = (color_a.b * area_a + color_b.b * area_b + color_c.b * area_c) / total_area
-
-        return mathutils.Color((r, g, b))
+        if layer is None:
+            layer = self.layer.name
+        colors = self.get_loop_colors(layer)
+        co, loop_vertices, loop_start, area = self.get_triangles()
+
+        loop = loop_start[face]
+        pa, pb, pc = (loop_vertices[loop + i] * 3 for i in range(3))
+        vert_a = mathutils.Vector(co[pa:pa + 3])
+        vert_b = mathutils.Vector(co[pb:pb + 3])
+        vert_c = mathutils.Vector(co[pc:pc + 3])
+        ia, ib, ic = loop * 3, loop * 3 + 3, loop * 3 + 6
+        area_tri = mathutils.geometry.area_tri
+        inv_area = 1. / area[face]
+        wa = area_tri(point, vert_b, vert_c) * inv_area
+        wb = area_tri(point, vert_a, vert_c) * inv_area
+        wc = area_tri(point, vert_a, vert_b) * inv_area
+
+        return mathutils.Color((
+            colors[ia] * wa + colors[ib] * wb + colors[ic] * wc,
+            colors[ia + 1] * wa + colors[ib + 1] * wb + colors[ic + 1] * wc,
+            colors[ia + 2] * wa + colors[ib + 2] * wb + colors[ic + 2] * wc))
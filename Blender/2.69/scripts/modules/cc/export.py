@@ -1,18 +1,9 @@
-class Color:
-    def __init__(self, r, g, b, a):
-        self.r = r
-        self.g = g
-        self.b = b
-        self.a = a
-
-    def __eq__(self, other):
-        return (self.r, self.g, self.b, self.a) == other
+import collections
 
-    def __iter__(self):
-        return iter((self.r, self.g, self.b, self.a))
+Color = collections.namedtuple('Color', 'r g b a')
 
 class Vertex:
-    def __init__(self, index, co, color, normal, aux_color=None):
+    def __init__(self, index, co=None, color=None, normal=None, aux_color=None):
         self.index = index
         self.co = co
         self.color = color
@@ -25,45 +16,47 @@ class Edge:
         self.b = b
 
 class Line:
-    def __init__(self, edge):
-        self.vertices = [edge.a, edge.b]
-
-    def is_connected(self, edge):
-        head = self.vertices[0]
-        tail = self.vertices[-1]
-        return (head == edge.a or head == edge.b or
-                tail == edge.a or tail == edge.b)
-
-    def extend(self, edge):
-        if self.is_connected(edge):
-            a, b = edge.a, edge.b
-            head = self.vertices[0]
-            tail = self.vertices[-1]
-            if a == head:
-                self.vertices.insert(0, b)
-            elif b == head:
-                self.vertices.insert(0, a)
-            elif a == tail:
-                self.vertices.append(b)
+    def __init__(self, vertices):
+        self.vertices = list(vertices)
+
+# chain edges into polylines, walking out from both ends of each seed edge
+def build_lines(edges):
+    adjacent = {}
+    for edge in edges:
+        adjacent.setdefault(edge.a.index, []).append(edge)
+        adjacent.setdefault(edge.b.index, []).append(edge)
+
+    used = set()
+    lines = []
+
+    def walk(vertex, push):
+        candidates = adjacent[vertex.index]
+        while True:
+            while candidates and candidates[-1] in used:
+                candidates.pop()
+            if not candidates:
+                return
+            edge = candidates.pop()
+            used.add(edge)
+            if edge.a.index == vertex.index:
+                vertex = edge.b
             else:
-                self.vertices.append(a)
-            return True
-        else:
-            return False
+                vertex = edge.a
+            push(vertex)
+            candidates = adjacent[vertex.index]
+
+    for edge in edges:
+        if edge in used:
+            continue
+        used.add(edge)
+        vertices = collections.deque((edge.a, edge.b))
+        walk(edge.b, vertices.append)
+        walk(edge.a, vertices.appendleft)
+        lines.append(Line(vertices))
 
-    def consume(self, edges):
-        consumed = -1
-        remaining = list(edges)
-        while consumed:
-            consumed = 0
-            for edge in list(remaining):
-                if self.extend(edge):
-                    consumed += 1
-                    remaining.remove(edge)
-        return remaining
+    return lines
 
 def floats_to_strings(floats, precision=6):
     fmt = '%%.%if' % precision
-    ret = map(lambda f: (fmt % f).rstrip('0').rstrip('.'), floats)
-    ret = map(lambda s: '0' if s == '-0' else s, ret)
-    return ret
+    strings = ((fmt % f).rstrip('0').rstrip('.') for f in floats)
+    return [s if s != '-0' else '0' for s in strings]